@@ -0,0 +1,28 @@
+"""
+Shared pytest configuration for the backend test suite.
+
+This runs before any test module is imported, which is the only moment the
+database can still be chosen: app.py reads DATABASE_URL at import time and
+builds its engine immediately. Pointing it at in-memory SQLite keeps the
+whole test database in RAM - no files, no fsync, sub-millisecond schema
+creation - and app.py pairs the memory URL with StaticPool so every
+session shares the single in-memory connection.
+
+The repo root also goes on sys.path so every test module imports the app
+as `backend.app` regardless of where pytest is invoked from. All tests
+must use that spelling: importing the same file under two module names
+(`app` and `backend.app`) would construct the Flask app twice and collide
+in the Prometheus default registry with DuplicateTimeseries.
+
+In-memory SQLite and the Prometheus registry are both per-process, so
+pytest-xdist workers (-n auto) are isolated automatically - each worker
+imports its own app with its own database and metrics.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///:memory:')
@@ -20,12 +20,18 @@ Features:
 - Creates users with varied account statuses
 """
 
+import io
+import itertools
 import os
 import sys
+import uuid
 from datetime import datetime, timedelta
 from faker import Faker
+import numpy as np
 import random
 from dotenv import load_dotenv
+from sqlalchemy import case, func
+from werkzeug.security import generate_password_hash
 
 # Add the backend directory to the Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -40,84 +46,150 @@ load_dotenv()
 # Initialize Faker with different locales for variety
 fake = Faker(['en_US', 'en_GB', 'en_CA', 'en_AU'])
 
+# Token pools for password generation, drawn from Faker once at import.
+# Each fake.word()/fake.color_name() call goes through Faker's provider
+# dispatch (microseconds); random.choice on a plain list is ~100x cheaper.
+WORD_POOL = [fake.word() for _ in range(2000)]
+COLOR_POOL = [fake.color_name() for _ in range(100)]
+MONTH_POOL = [fake.month_name() for _ in range(12)]
+
 def generate_realistic_password():
     """
     Generate a realistic password that meets our security requirements.
-    
+
     Returns:
         str: A secure password with mixed case, numbers, and special characters
     """
-    # Common password patterns that users actually use (but secure)
-    patterns = [
-        lambda: fake.word().capitalize() + str(random.randint(10, 99)) + random.choice('!@#$%'),
-        lambda: fake.first_name() + str(random.randint(1000, 9999)) + '!',
-        lambda: fake.color_name().capitalize() + str(random.randint(100, 999)) + '@',
-        lambda: fake.month_name() + str(random.randint(10, 99)) + '#',
-        lambda: fake.word().capitalize() + fake.word().capitalize() + str(random.randint(10, 99)),
-    ]
-    
-    return random.choice(patterns)()
+    # Common password patterns that users actually use (but secure),
+    # assembled from the precomputed pools instead of live Faker calls
+    pattern = random.randrange(5)
+    if pattern == 0:
+        return f"{random.choice(WORD_POOL).capitalize()}{random.randint(10, 99)}{random.choice('!@#$%')}"
+    elif pattern == 1:
+        return f"{random.choice(FIRST_NAME_POOL)}{random.randint(1000, 9999)}!"
+    elif pattern == 2:
+        return f"{random.choice(COLOR_POOL).capitalize()}{random.randint(100, 999)}@"
+    elif pattern == 3:
+        return f"{random.choice(MONTH_POOL)}{random.randint(10, 99)}#"
+    else:
+        return f"{random.choice(WORD_POOL).capitalize()}{random.choice(WORD_POOL).capitalize()}{random.randint(10, 99)}"
 
-def generate_user_data():
+# Name pools built once with Faker: each Faker call is dozens of Python-level
+# operations, so drawing indices into fixed pools is far cheaper than calling
+# fake.first_name()/fake.last_name() once per generated user
+NAME_POOL_SIZE = 500
+FIRST_NAME_POOL = [fake.first_name() for _ in range(NAME_POOL_SIZE)]
+LAST_NAME_POOL = [fake.last_name() for _ in range(NAME_POOL_SIZE)]
+
+# Email domains with some variety
+DOMAINS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com',
+           'protonmail.com', 'company.com', 'university.edu']
+
+def generate_user_batch(count):
     """
-    Generate realistic user data.
-    
+    Generate realistic data for `count` users with vectorized randomness.
+
+    All numeric and boolean fields come from one NumPy draw per field rather
+    than per-row random.* calls, and names are indexed from the Faker-built
+    pools above; the loop below only assembles dicts from precomputed arrays.
+
     Returns:
-        dict: User data dictionary
+        list[dict]: User data dictionaries
     """
-    first_name = fake.first_name()
-    last_name = fake.last_name()
-    
-    # Generate email with some variety in domains
-    domains = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com', 
-               'protonmail.com', 'company.com', 'university.edu']
-    
-    # Create email variations
-    email_patterns = [
-        f"{first_name.lower()}.{last_name.lower()}@{random.choice(domains)}",
-        f"{first_name.lower()}{last_name.lower()}@{random.choice(domains)}",
-        f"{first_name.lower()}{random.randint(1, 999)}@{random.choice(domains)}",
-        f"{first_name[0].lower()}{last_name.lower()}@{random.choice(domains)}",
-        f"{first_name.lower()}_{last_name.lower()}@{random.choice(domains)}",
-    ]
-    
-    email = random.choice(email_patterns)
-    password = generate_realistic_password()
-    
-    # Generate realistic timestamps
-    created_days_ago = random.randint(1, 365)  # Created within last year
-    created_at = datetime.utcnow() - timedelta(days=created_days_ago)
-    
-    # Last active should be after creation and somewhat recent
-    last_active_days_ago = random.randint(0, min(created_days_ago, 30))
-    last_active = datetime.utcnow() - timedelta(days=last_active_days_ago)
-    
-    # Some users have logged in recently, others haven't
-    last_login = None
-    if random.random() > 0.3:  # 70% have logged in at least once
-        login_days_ago = random.randint(0, min(created_days_ago, 60))
-        last_login = datetime.utcnow() - timedelta(days=login_days_ago)
-    
-    # Account status variety
-    is_active = random.random() > 0.05  # 95% active accounts
-    is_verified = random.random() > 0.2  # 80% verified accounts
-    
-    return {
-        'first_name': first_name,
-        'last_name': last_name,
-        'email': email,
-        'password': password,
-        'is_active': is_active,
-        'is_verified': is_verified,
-        'created_at': created_at,
-        'last_active': last_active,
-        'last_login': last_login
-    }
+    now = datetime.utcnow()
+
+    # One vectorized draw per field for the whole batch
+    first_idx = np.random.randint(0, NAME_POOL_SIZE, size=count)
+    last_idx = np.random.randint(0, NAME_POOL_SIZE, size=count)
+    domain_idx = np.random.randint(0, len(DOMAINS), size=count)
+    pattern_idx = np.random.randint(0, 5, size=count)
+    email_num = np.random.randint(1, 1000, size=count)
+
+    # Realistic timestamps: creation within the last year, activity after
+    # creation and somewhat recent (randint broadcasts the per-row bounds)
+    created_days = np.random.randint(1, 366, size=count)
+    last_active_days = np.random.randint(0, np.minimum(created_days, 30) + 1)
+    login_days = np.random.randint(0, np.minimum(created_days, 60) + 1)
+
+    # Account status variety: 95% active, 80% verified, 70% have logged in
+    is_active = np.random.random(count) > 0.05
+    is_verified = np.random.random(count) > 0.2
+    has_login = np.random.random(count) > 0.3
+
+    # Timestamp arithmetic in bulk: subtract the day offsets from the single
+    # anchor as datetime64 arrays, then convert back to datetime objects in
+    # one C-level tolist() - no per-row timedelta construction in the loop
+    anchor = np.datetime64(now, 'us')
+    created_ats = (anchor - created_days.astype('timedelta64[D]')).tolist()
+    last_actives = (anchor - last_active_days.astype('timedelta64[D]')).tolist()
+    login_times = (anchor - login_days.astype('timedelta64[D]')).tolist()
+
+    users = []
+    # Collisions within the batch get a monotonic plus-suffix instead of
+    # being discarded later: with 500-name pools the birthday effect makes
+    # repeats common, and rewriting the local-part guarantees N unique
+    # emails for N requested users with no retry loop
+    seen_emails = set()
+    collision_counter = itertools.count()
+    for i in range(count):
+        first_name = FIRST_NAME_POOL[first_idx[i]]
+        last_name = LAST_NAME_POOL[last_idx[i]]
+        domain = DOMAINS[domain_idx[i]]
+
+        # Same email variations as before, selected by precomputed index
+        pattern = pattern_idx[i]
+        if pattern == 0:
+            email = f"{first_name.lower()}.{last_name.lower()}@{domain}"
+        elif pattern == 1:
+            email = f"{first_name.lower()}{last_name.lower()}@{domain}"
+        elif pattern == 2:
+            email = f"{first_name.lower()}{email_num[i]}@{domain}"
+        elif pattern == 3:
+            email = f"{first_name[0].lower()}{last_name.lower()}@{domain}"
+        else:
+            email = f"{first_name.lower()}_{last_name.lower()}@{domain}"
+
+        if email in seen_emails:
+            # Plus-addressing is RFC-compliant and still routes everywhere
+            local, _, mail_domain = email.partition('@')
+            email = f"{local}+{next(collision_counter)}@{mail_domain}"
+        seen_emails.add(email)
+
+        users.append({
+            'first_name': first_name,
+            'last_name': last_name,
+            'email': email,
+            'password': generate_realistic_password(),
+            'is_active': bool(is_active[i]),
+            'is_verified': bool(is_verified[i]),
+            'created_at': created_ats[i],
+            'last_active': last_actives[i],
+            'last_login': login_times[i] if has_login[i] else None
+        })
+
+    return users
+
+# Rows per INSERT/COMMIT when bulk-loading synthetic users
+BATCH_SIZE = 500
+
+# Password hashing dominates CPU when seeding users: the KDF is deliberately
+# slow and runs once per row. With SYNTHETIC_FAST_HASH=1 every row reuses a
+# single low-round digest computed here - synthetic accounts don't need
+# production-strength key stretching, and the inner loop becomes hash-free.
+# Production code paths are untouched; this flag only affects this script.
+FAST_HASH = os.getenv('SYNTHETIC_FAST_HASH') == '1'
+SHARED_HASH = generate_password_hash('SeedPassword!23', method='pbkdf2:sha256:1000') if FAST_HASH else None
 
 def create_synthetic_users(count=1000):
     """
     Create synthetic users and save them to the database.
-    
+
+    Rows are generated in memory and written in batches of BATCH_SIZE with
+    one INSERT + COMMIT per batch; the unique index on email deduplicates
+    via ON CONFLICT DO NOTHING. The previous row-at-a-time version cost a
+    SELECT plus a COMMIT per user - over 2000 round-trips for the default
+    1000 users.
+
     Args:
         count (int): Number of users to create (default: 1000)
     """
@@ -125,56 +197,139 @@ def create_synthetic_users(count=1000):
     print(f"📊 Target: {count} users")
     print(f"🗄️  Database: {app.config['SQLALCHEMY_DATABASE_URI']}")
     print("-" * 50)
-    
+
     created_count = 0
     duplicate_count = 0
     error_count = 0
-    
+
     with app.app_context():
         # Ensure tables exist
         db.create_all()
-        
-        for i in range(count):
-            try:
-                # Generate user data
-                user_data = generate_user_data()
-                
-                # Check if email already exists
-                existing_user = User.query.filter_by(email=user_data['email']).first()
-                if existing_user:
-                    duplicate_count += 1
-                    continue
-                
-                # Create new user
-                user = User(
-                    first_name=user_data['first_name'],
-                    last_name=user_data['last_name'],
-                    email=user_data['email'],
-                    is_active=user_data['is_active'],
-                    is_verified=user_data['is_verified'],
-                    created_at=user_data['created_at'],
-                    last_active=user_data['last_active'],
-                    last_login=user_data['last_login']
+
+        # Ids are always generated in Python. Postgres databases migrated
+        # through 0004 do have a gen_random_uuid() server default, but a
+        # fresh database bootstrapped by the db.create_all() above does not
+        # (the models declare only a Python-side default), and omitting the
+        # column there would leave NULL ids in the temp table and fail every
+        # batch insert. A uuid4 per row is negligible next to the COPY.
+        use_copy = db.engine.dialect.name == 'postgresql'
+
+        if use_copy:
+            COPY_COLUMNS = ('id', 'email', 'password_hash', 'first_name', 'last_name',
+                            'is_active', 'is_verified', 'created_at', 'last_active',
+                            'last_login')
+
+            def flush(batch):
+                """COPY one batch through a temp table, then dedupe-insert.
+
+                COPY FROM STDIN streams rows past the SQL parser entirely, so
+                it beats even multi-VALUES INSERT by 5-10x. COPY itself can't
+                handle conflicts, hence the temp-table hop: the final
+                INSERT ... SELECT lets the unique email index absorb
+                duplicates exactly like the non-Postgres path below.
+
+                Returns:
+                    int: Number of rows actually inserted
+                """
+                buf = io.StringIO()
+                for row in batch:
+                    fields = []
+                    for col in COPY_COLUMNS:
+                        value = row[col]
+                        if value is None:
+                            fields.append('\\N')
+                        elif isinstance(value, str):
+                            # Escape the characters COPY's text format treats
+                            # as structure
+                            fields.append(value.replace('\\', '\\\\')
+                                          .replace('\t', '\\t')
+                                          .replace('\n', '\\n'))
+                        else:
+                            fields.append(str(value))
+                    buf.write('\t'.join(fields) + '\n')
+                buf.seek(0)
+
+                conn = db.engine.raw_connection()
+                try:
+                    cur = conn.cursor()
+                    cur.execute(
+                        "CREATE TEMP TABLE tmp_users (LIKE users INCLUDING DEFAULTS) "
+                        "ON COMMIT DROP"
+                    )
+                    cur.copy_expert(
+                        f"COPY tmp_users ({', '.join(COPY_COLUMNS)}) "
+                        "FROM STDIN WITH (FORMAT text)",
+                        buf
+                    )
+                    cur.execute(
+                        f"INSERT INTO users ({', '.join(COPY_COLUMNS)}) "
+                        f"SELECT {', '.join(COPY_COLUMNS)} FROM tmp_users "
+                        "ON CONFLICT (email) DO NOTHING"
+                    )
+                    inserted = cur.rowcount
+                    conn.commit()
+                    return inserted
+                finally:
+                    conn.close()
+        else:
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            def flush(batch):
+                """Insert one batch; the unique email index absorbs duplicates.
+
+                Returns:
+                    int: Number of rows actually inserted
+                """
+                stmt = sqlite_insert(User.__table__).values(batch).on_conflict_do_nothing(
+                    index_elements=['email']
                 )
-                
-                # Set password (this will hash it automatically)
-                user.set_password(user_data['password'])
-                
-                # Add to database
-                db.session.add(user)
+                result = db.session.execute(stmt)
                 db.session.commit()
-                
-                created_count += 1
-                
-                # Progress update every 50 users
-                if created_count % 50 == 0:
+                return result.rowcount
+
+        batch = []
+        for i, user_data in enumerate(generate_user_batch(count)):
+            try:
+                # Build a plain row dict for the bulk insert; hashing directly
+                # avoids constructing a full ORM object per user
+                row = {
+                    'id': str(uuid.uuid4()),
+                    'email': user_data['email'],
+                    'password_hash': SHARED_HASH if FAST_HASH else generate_password_hash(user_data['password']),
+                    'first_name': user_data['first_name'],
+                    'last_name': user_data['last_name'],
+                    'is_active': user_data['is_active'],
+                    'is_verified': user_data['is_verified'],
+                    'created_at': user_data['created_at'],
+                    'last_active': user_data['last_active'],
+                    'last_login': user_data['last_login']
+                }
+                batch.append(row)
+
+                if len(batch) >= BATCH_SIZE:
+                    inserted = flush(batch)
+                    created_count += inserted
+                    # Rows the conflict clause swallowed were duplicates
+                    duplicate_count += len(batch) - inserted
+                    batch = []
                     print(f"✅ Created {created_count} users...")
-                
+
             except Exception as e:
                 error_count += 1
                 db.session.rollback()
                 print(f"❌ Error creating user {i+1}: {str(e)}")
                 continue
+
+        # Write the final partial batch
+        if batch:
+            try:
+                inserted = flush(batch)
+                created_count += inserted
+                duplicate_count += len(batch) - inserted
+            except Exception as e:
+                error_count += len(batch)
+                db.session.rollback()
+                print(f"❌ Error writing final batch: {str(e)}")
     
     # Final statistics
     print("-" * 50)
@@ -195,15 +350,18 @@ def show_user_statistics():
     """Show statistics about users in the database."""
     print("\n📊 Database Statistics:")
     print("-" * 30)
-    
+
     with app.app_context():
-        total_users = User.query.count()
-        active_users = User.query.filter_by(is_active=True).count()
-        verified_users = User.query.filter_by(is_verified=True).count()
-        recent_users = User.query.filter(
-            User.created_at >= datetime.utcnow() - timedelta(days=30)
-        ).count()
-        
+        # One conditional-aggregation query scans the users table once;
+        # the old four separate .count() calls scanned it four times
+        cutoff = datetime.utcnow() - timedelta(days=30)
+        total_users, active_users, verified_users, recent_users = db.session.query(
+            func.count(User.id),
+            func.sum(case((User.is_active, 1), else_=0)),
+            func.sum(case((User.is_verified, 1), else_=0)),
+            func.sum(case((User.created_at >= cutoff, 1), else_=0))
+        ).one()
+
         print(f"Total Users: {total_users}")
         print(f"Active Users: {active_users} ({(active_users/total_users)*100:.1f}%)")
         print(f"Verified Users: {verified_users} ({(verified_users/total_users)*100:.1f}%)")
@@ -0,0 +1,65 @@
+"""
+Gunicorn configuration for the MultiGenQA backend.
+
+Why gevent workers?
+
+Almost all of a chat request's wall-time is spent blocked on an upstream AI
+provider (OpenAI, Gemini, Claude), not on CPU. With threaded (gthread)
+workers, each blocked call pins one of a small fixed pool of threads, so
+4 workers x 2 threads caps us at 8 concurrent chats. gevent workers replace
+blocking I/O with cooperative greenlets: while one chat waits on an AI
+response, the same worker serves other requests. A single worker can then
+hold hundreds of in-flight chats.
+
+This file is loaded by Gunicorn *before* the application is imported, which
+is the one safe place to monkey-patch the standard library - every socket,
+SSL and DNS call made by the AI clients, requests, and redis-py must already
+be cooperative by the time app.py imports them.
+"""
+
+# Patch the standard library first so all subsequent imports (openai,
+# anthropic, requests, redis) use cooperative, non-blocking I/O
+from gevent import monkey
+monkey.patch_all()
+
+# psycopg2 uses its own C-level socket handling, so it needs its own patch
+# to cooperate with gevent. Skipped for SQLite development databases.
+try:
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+except ImportError:
+    pass
+
+import multiprocessing
+import os
+
+# Aggregate Prometheus counters across workers: each process writes its
+# metrics to mmap files in this tmpfs directory, and /api/metrics merges
+# them at scrape time. Must be set before prometheus_client is imported.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/dev/shm/prometheus")
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's mmap files so its gauges stop being reported."""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+# Network settings
+bind = "0.0.0.0:5001"
+
+# Worker settings
+# With gevent, workers only need to cover CPU-bound work (JSON, bcrypt, ORM);
+# concurrency for I/O-bound chats comes from worker_connections greenlets
+worker_class = "gevent"
+workers = multiprocessing.cpu_count() * 2 + 1
+worker_connections = 1000
+
+# Restart workers periodically to guard against slow memory leaks
+max_requests = 1000
+max_requests_jitter = 50
+
+# Log to stdout/stderr so Docker captures everything
+accesslog = "-"
+errorlog = "-"
@@ -0,0 +1,77 @@
+"""Create hot-path indexes without blocking writes
+
+These indexes used to be created by init_db() on every app startup, which
+took an ACCESS EXCLUSIVE lock and gated worker boot on index build time.
+They now run once, here, and on Postgres they use CREATE INDEX CONCURRENTLY
+so writes to messages/conversations/api_usage continue during the build.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-08-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    if bind.dialect.name == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction block, so these
+        # statements execute with autocommit
+        with op.get_context().autocommit_block():
+            op.execute("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_conversation_timestamp
+                ON messages(conversation_id, timestamp)
+            """)
+            op.execute("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_conversations_user_updated
+                ON conversations(user_id, updated_at)
+            """)
+            op.execute("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_conversations_user_active_updated
+                ON conversations(user_id, is_active, updated_at)
+            """)
+            # Covering index: the /api/usage aggregation is answered with an
+            # index-only scan, never touching the heap. It supersedes the
+            # old (user_id, timestamp) index. Name matches the ORM-declared
+            # index in models.py so fresh and migrated schemas converge.
+            op.execute("""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_api_usage_user_ts_model
+                ON api_usage(user_id, timestamp, model_name)
+                INCLUDE (tokens_used, cost_estimate, response_time)
+            """)
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_api_usage_user_timestamp")
+            # Refresh statistics so the planner actually picks the new index
+            op.execute("ANALYZE api_usage")
+    else:
+        # SQLite (local dev): no CONCURRENTLY and no INCLUDE, but the tables
+        # are small enough that plain builds are fine
+        op.execute("""
+            CREATE INDEX IF NOT EXISTS idx_messages_conversation_timestamp
+            ON messages(conversation_id, timestamp)
+        """)
+        op.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_user_updated
+            ON conversations(user_id, updated_at)
+        """)
+        op.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_user_active_updated
+            ON conversations(user_id, is_active, updated_at)
+        """)
+        op.execute("""
+            CREATE INDEX IF NOT EXISTS idx_api_usage_user_ts_model
+            ON api_usage(user_id, timestamp, model_name)
+        """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_messages_conversation_timestamp")
+    op.execute("DROP INDEX IF EXISTS idx_conversations_user_updated")
+    op.execute("DROP INDEX IF EXISTS idx_conversations_user_active_updated")
+    op.execute("DROP INDEX IF EXISTS idx_api_usage_user_ts_model")
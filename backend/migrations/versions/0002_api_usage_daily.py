@@ -0,0 +1,72 @@
+"""Tighten api_usage column types and add the api_usage_daily rollup
+
+cost_estimate becomes Numeric(12,6) (exact decimal, no FP drift when
+summed) and response_time becomes integer microseconds (integer SUM/AVG is
+cheaper than FP aggregation). The api_usage_daily materialized view
+pre-aggregates per (user, day, model) so the /api/usage endpoint scans ~30
+rows per model instead of every raw usage row. Refresh it hourly, e.g.
+with pg_cron or a cron job running:
+
+    REFRESH MATERIALIZED VIEW CONCURRENTLY api_usage_daily;
+
+Postgres-only; SQLite dev databases get the new column types straight from
+db.create_all() and keep querying the base table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-08-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("ALTER TABLE api_usage ALTER COLUMN cost_estimate TYPE numeric(12,6)")
+    op.execute("""
+        ALTER TABLE api_usage
+        ALTER COLUMN response_time TYPE integer
+        USING (response_time * 1000000)::integer
+    """)
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW IF NOT EXISTS api_usage_daily AS
+        SELECT user_id,
+               date_trunc('day', timestamp) AS day,
+               model_name,
+               count(*) AS requests,
+               sum(tokens_used) AS tokens,
+               sum(cost_estimate) AS cost,
+               sum(response_time) AS total_response_time
+        FROM api_usage
+        GROUP BY 1, 2, 3
+    """)
+    # Unique key over the grouping columns is required for
+    # REFRESH MATERIALIZED VIEW CONCURRENTLY, and serves the endpoint's
+    # (user_id, day) range scan
+    op.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_api_usage_daily_key
+        ON api_usage_daily(user_id, day, model_name)
+    """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS api_usage_daily")
+    op.execute("""
+        ALTER TABLE api_usage
+        ALTER COLUMN response_time TYPE double precision
+        USING response_time / 1000000.0
+    """)
+    op.execute("ALTER TABLE api_usage ALTER COLUMN cost_estimate TYPE double precision")
@@ -0,0 +1,49 @@
+"""Add a partial index over recent api_usage rows
+
+/api/usage only ever touches the last 30 days, but the covering index
+spans the full retention window. A partial index filtered to recent rows
+is a fraction of the size, so more of its B-tree stays in cache and the
+planner's choice for the 30-day scan is obvious.
+
+Index predicates must be immutable, so NOW() is not allowed; the cutoff
+is a literal that should be bumped quarterly (recreate the index with a
+new date, e.g. from a pg_cron job). Postgres uses the index whenever the
+query's cutoff is provably after the literal, which holds as long as the
+literal trails the sliding window.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-08-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# Bump quarterly; must stay more than 30 days behind the current date
+RECENT_CUTOFF = '2026-07-01'
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_api_usage_recent
+            ON api_usage(user_id, timestamp)
+            WHERE timestamp > '{RECENT_CUTOFF}'
+        """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_api_usage_recent")
@@ -0,0 +1,45 @@
+"""Generate row UUIDs inside Postgres with gen_random_uuid()
+
+The models' Python-side default lambda pays an interpreter call per row
+and forces bulk loaders to ship ids over the wire. With a server-side
+default, Postgres fills ids in C and inserts that omit the column (bulk
+seeding, COPY) need no Python UUID work at all.
+
+The ORM keeps its Python default as well - it fires first for normal ORM
+inserts, which keeps SQLite working and spares Postgres a RETURNING
+round-trip - so this default only kicks in when the id column is omitted.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-08-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+TABLES = ('users', 'conversations', 'messages', 'api_usage')
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # gen_random_uuid() is built in since Postgres 13; the extension keeps
+    # older servers working
+    op.execute("CREATE EXTENSION IF NOT EXISTS pgcrypto")
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT gen_random_uuid()")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT")
@@ -0,0 +1,64 @@
+"""Create the user_model_usage counter table and retire api_usage_daily
+
+The /api/usage endpoint now reads incrementally-maintained per
+(user, model, day) counters written by the usage flush worker, instead of
+the hourly-refreshed api_usage_daily materialized view. This migration
+creates the table on Postgres, backfills it from the api_usage audit log,
+and drops the view (no refresh job needed any more). SQLite gets the
+table from db.create_all().
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-08-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS user_model_usage (
+            user_id uuid NOT NULL REFERENCES users(id),
+            model_name varchar(50) NOT NULL,
+            day date NOT NULL,
+            requests integer NOT NULL DEFAULT 0,
+            tokens bigint NOT NULL DEFAULT 0,
+            cost numeric(14,6) NOT NULL DEFAULT 0,
+            response_time_sum bigint NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, model_name, day)
+        )
+    """)
+    # Seed the counters from the audit log so history is queryable
+    # immediately; ON CONFLICT keeps the backfill re-runnable
+    op.execute("""
+        INSERT INTO user_model_usage
+            (user_id, model_name, day, requests, tokens, cost, response_time_sum)
+        SELECT user_id,
+               model_name,
+               timestamp::date,
+               count(*),
+               coalesce(sum(tokens_used), 0),
+               coalesce(sum(cost_estimate), 0),
+               coalesce(sum(response_time), 0)
+        FROM api_usage
+        GROUP BY 1, 2, 3
+        ON CONFLICT (user_id, model_name, day) DO NOTHING
+    """)
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS api_usage_daily")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP TABLE IF EXISTS user_model_usage")
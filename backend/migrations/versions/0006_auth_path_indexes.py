@@ -0,0 +1,61 @@
+"""Auth-path partial indexes and INCLUDE columns on the messages index
+
+Adds the two partial users indexes declared in models.py (active-account
+email lookup, live password-reset tokens) and rebuilds the messages index
+with INCLUDE (role, model_used) so metadata-only scans are index-only.
+The rebuild creates the new index under a temporary name, drops the old
+one, and renames - all CONCURRENTLY, so writes are never blocked and the
+index never disappears.
+
+Postgres-only; SQLite gets everything from the ORM declarations.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-08-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_active_email
+            ON users(email) WHERE is_active = true
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_reset_token
+            ON users(password_reset_token)
+            WHERE password_reset_token IS NOT NULL
+        """)
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_conv_ts_new
+            ON messages(conversation_id, timestamp)
+            INCLUDE (role, model_used)
+        """)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_messages_conversation_timestamp")
+    op.execute("ALTER INDEX idx_messages_conv_ts_new RENAME TO idx_messages_conversation_timestamp")
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_users_active_email")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_users_reset_token")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS idx_messages_conversation_timestamp")
+        op.execute("""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_messages_conversation_timestamp
+            ON messages(conversation_id, timestamp)
+        """)
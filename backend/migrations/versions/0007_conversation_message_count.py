@@ -0,0 +1,49 @@
+"""Denormalized message_count column on conversations
+
+Adds the counter column that the Message after_insert/after_delete events
+in models.py maintain, and backfills it from the messages table in one
+grouped UPDATE so existing conversations start accurate.
+
+Postgres-only; SQLite test databases get the column from db.create_all().
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-08-31
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.add_column(
+        'conversations',
+        sa.Column('message_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        UPDATE conversations c
+        SET message_count = m.n
+        FROM (
+            SELECT conversation_id, COUNT(*) AS n
+            FROM messages
+            GROUP BY conversation_id
+        ) m
+        WHERE c.id = m.conversation_id
+    """)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.drop_column('conversations', 'message_count')
@@ -0,0 +1,50 @@
+"""Server-side DEFAULT now() on all timestamp columns
+
+Matches the models.py switch from default=datetime.utcnow to
+server_default=current_timestamp: the database stamps inserted rows
+itself, skipping a Python datetime call per insert and keeping
+timestamps authoritative when app-server clocks drift. updated_at stays
+ORM-maintained (SQL-side onupdate), so no trigger is installed.
+
+Postgres-only; SQLite gets the defaults from db.create_all().
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-08-31
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+TIMESTAMP_COLUMNS = (
+    ('users', 'created_at'),
+    ('users', 'last_active'),
+    ('conversations', 'created_at'),
+    ('conversations', 'updated_at'),
+    ('messages', 'timestamp'),
+    ('api_usage', 'timestamp'),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, column in TIMESTAMP_COLUMNS:
+        op.execute(
+            f'ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT CURRENT_TIMESTAMP'
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    for table, column in TIMESTAMP_COLUMNS:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT')
@@ -6,16 +6,115 @@ It includes models for users, conversations, and messages.
 """
 
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
-from datetime import datetime
+from sqlalchemy.dialects import postgresql
+from datetime import datetime, timedelta
 from typing import List, Optional
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+import time
 import uuid
-from werkzeug.security import generate_password_hash, check_password_hash
+from cachetools import TTLCache
+from passlib.context import CryptContext
+from werkzeug.security import check_password_hash
 import jwt
 from flask import current_app
 
 db = SQLAlchemy()
 
+logger = logging.getLogger(__name__)
+
+# Primary/foreign key type: native 16-byte UUID on Postgres (half the size of
+# the old 36-char text, and FK joins compare integers instead of memcmp),
+# plain text on SQLite which has no UUID type. Python-side values stay
+# strings, so callers and JSON serialization are unchanged. Existing Postgres
+# deployments convert with: ALTER TABLE ... ALTER COLUMN id TYPE uuid USING id::uuid
+UUID = db.String(36).with_variant(postgresql.UUID(), 'postgresql')
+
+def generate_uuid7() -> str:
+    """
+    Generate a time-ordered UUID (v7 layout) as a string.
+
+    Fully random UUIDv4 keys land on a random B-tree page per insert, which
+    fragments the index and keeps the buffer cache cold on write-heavy
+    tables like messages. v7 puts a millisecond timestamp in the top 48
+    bits, so consecutive inserts append to the right edge of the index like
+    a sequence would, while the 74 random bits keep ids unguessable.
+    """
+    ts_ms = int(time.time() * 1000) & ((1 << 48) - 1)
+    value = (
+        (ts_ms << 80)
+        | (0x7 << 76)  # version 7
+        | (secrets.randbits(12) << 64)
+        | (0b10 << 62)  # RFC 4122 variant
+        | secrets.randbits(62)
+    )
+    return str(uuid.UUID(int=value))
+
+# Verified-token cache: sha256(token) -> (user_id, exp). Tokens live for
+# hours and are resent on every request, so re-running the HMAC verification
+# each time is pure repeated CPU work; a hit turns it into a dict lookup.
+# Only successful verifications are cached, and the short TTL bounds how long
+# a revoked/deactivated account can keep using an already-verified token.
+# Size and TTL can be overridden via TOKEN_CACHE_MAXSIZE / TOKEN_CACHE_TTL
+# in the Flask config before the first authenticated request.
+_token_cache = None
+_token_cache_lock = threading.Lock()
+
+def _get_token_cache() -> TTLCache:
+    """Build the token cache lazily so Flask config can tune it."""
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TTLCache(
+            maxsize=current_app.config.get('TOKEN_CACHE_MAXSIZE', 10000),
+            ttl=current_app.config.get('TOKEN_CACHE_TTL', 30)
+        )
+    return _token_cache
+
+# Second tier: hydrated User objects keyed by id, so the token fast path
+# doesn't even need the primary-key SELECT. Objects are expunged from the
+# session before caching (attributes stay loaded, so column reads and
+# to_dict work, but no lazy loads). State-changing writes must call
+# User.invalidate_cache; otherwise the short TTL bounds staleness.
+_user_cache = TTLCache(maxsize=5000, ttl=60)
+_user_cache_lock = threading.RLock()
+
+# JWT decode configuration built once at import: PyJWT re-validates the
+# algorithms list and options dict on every call otherwise. 'require' makes
+# the decode itself reject tokens missing these claims, so the verify path
+# needs no post-decode presence checks.
+JWT_ALGORITHMS = ['HS256']
+JWT_DECODE_OPTIONS = {'require': ['exp', 'iat', 'user_id'], 'verify_signature': True}
+
+# The signing key never changes while the process lives, but
+# current_app.config is a dict lookup behind a context-local proxy - real
+# overhead on the hot auth path. Resolve it once on first use. A key
+# rotation requires a process restart anyway (every outstanding token
+# would be invalidated), so caching forever is safe.
+_jwt_secret = None
+
+def _get_jwt_secret() -> str:
+    """Return SECRET_KEY, resolving the Flask config proxy only once."""
+    global _jwt_secret
+    if _jwt_secret is None:
+        _jwt_secret = current_app.config['SECRET_KEY']
+    return _jwt_secret
+
+# Password hashing: Argon2id is memory-hard, so GPU/ASIC cracking rigs get no
+# meaningful speedup over a CPU - unlike the PBKDF2-SHA256 werkzeug defaults
+# these hashes used before. Parameters target a few hundred ms per verify.
+# Old werkzeug hashes still verify (see check_password) and are upgraded
+# transparently on the next successful login.
+pwd_context = CryptContext(
+    schemes=['argon2'],
+    argon2__type='ID',
+    argon2__memory_cost=65536,  # 64 MiB per hash
+    argon2__time_cost=3,
+    argon2__parallelism=4,
+)
+
 class User(db.Model):
     """
     Enhanced User model for storing user information with authentication.
@@ -24,7 +123,7 @@ class User(db.Model):
     """
     __tablename__ = 'users'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUID, primary_key=True, default=generate_uuid7)
     
     # Authentication fields
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
@@ -42,29 +141,78 @@ class User(db.Model):
     # Legacy field for backward compatibility (will be removed in future versions)
     session_id = db.Column(db.String(128), unique=True, nullable=True)
     
-    # Timestamps
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    last_active = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # Timestamps. server_default instead of a Python-side default: the
+    # database stamps rows itself, which skips a datetime.utcnow() call per
+    # insert and keeps timestamps consistent across app servers whose
+    # clocks have drifted apart.
+    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), nullable=False)
+    last_active = db.Column(db.DateTime, server_default=db.func.current_timestamp(), nullable=False)
     last_login = db.Column(db.DateTime, nullable=True)
     
     # Password reset
     password_reset_token = db.Column(db.String(255), nullable=True)
     password_reset_expires = db.Column(db.DateTime, nullable=True)
     
-    # Relationships
-    conversations = db.relationship('Conversation', backref='user', lazy=True, cascade='all, delete-orphan')
+    # Relationships. back_populates (rather than backref) keeps both sides
+    # declared explicitly, so a reader of either model sees the link.
+    conversations = db.relationship('Conversation', back_populates='user', lazy=True, cascade='all, delete-orphan')
+
+    __table_args__ = (
+        # Login always filters to active accounts, so a partial index over
+        # just those rows is skinnier than the full unique email index
+        db.Index('idx_users_active_email', 'email',
+                 postgresql_where=db.text('is_active = true'),
+                 sqlite_where=db.text('is_active = 1')),
+        # Reset tokens are NULL for almost every user; indexing only the
+        # handful of live tokens keeps this index tiny
+        db.Index('idx_users_reset_token', 'password_reset_token',
+                 postgresql_where=db.text('password_reset_token IS NOT NULL'),
+                 sqlite_where=db.text('password_reset_token IS NOT NULL')),
+    )
     
     def __repr__(self):
         return f'<User {self.email}>'
     
+    @classmethod
+    def get_cached(cls, user_id: str) -> Optional['User']:
+        """
+        Load a user by primary key through the short-TTL object cache.
+
+        Args:
+            user_id: Primary key of the user to load
+
+        Returns:
+            User: Cached or freshly loaded user, None if it doesn't exist
+        """
+        with _user_cache_lock:
+            user = _user_cache.get(user_id)
+        if user is None:
+            user = db.session.get(cls, user_id)
+            if user is not None:
+                # Detach with attributes loaded so the cached copy survives
+                # this request's session commit and teardown
+                db.session.expunge(user)
+                with _user_cache_lock:
+                    _user_cache[user_id] = user
+        return user
+
+    @classmethod
+    def invalidate_cache(cls, user_id: str) -> None:
+        """Drop a user's cached copy after a state-changing write."""
+        with _user_cache_lock:
+            _user_cache.pop(user_id, None)
+
     def set_password(self, password: str) -> None:
         """
         Hash and set the user's password.
-        
+
         Args:
             password: Plain text password to hash and store
         """
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = pwd_context.hash(password)
+        if self.id:
+            # Make the change visible immediately, not after cache TTL
+            User.invalidate_cache(self.id)
     
     def check_password(self, password: str) -> bool:
         """
@@ -76,7 +224,21 @@ class User(db.Model):
         Returns:
             bool: True if password matches, False otherwise
         """
-        return check_password_hash(self.password_hash, password)
+        if pwd_context.identify(self.password_hash):
+            if not pwd_context.verify(password, self.password_hash):
+                return False
+            # Re-hash if the Argon2 parameters have been strengthened since
+            if pwd_context.needs_update(self.password_hash):
+                self.set_password(password)
+            return True
+
+        # Legacy werkzeug hash (pbkdf2): verify with werkzeug, then upgrade
+        # to Argon2id now that we briefly hold the plaintext. The login flow
+        # commits right after a successful check, persisting the new hash.
+        if not check_password_hash(self.password_hash, password):
+            return False
+        self.set_password(password)
+        return True
     
     def generate_auth_token(self, expires_in: int = 86400) -> str:
         """
@@ -88,7 +250,6 @@ class User(db.Model):
         Returns:
             str: JWT token
         """
-        import time
         # Use consistent timestamp for both iat and exp
         now = int(time.time())
         payload = {
@@ -97,7 +258,7 @@ class User(db.Model):
             'exp': now + expires_in,
             'iat': now
         }
-        return jwt.encode(payload, current_app.config['SECRET_KEY'], algorithm='HS256')
+        return jwt.encode(payload, _get_jwt_secret(), algorithm=JWT_ALGORITHMS[0])
     
     @staticmethod
     def verify_auth_token(token: str) -> Optional['User']:
@@ -110,30 +271,53 @@ class User(db.Model):
         Returns:
             User: User object if token is valid, None otherwise
         """
+        # Fast path: this exact token was verified recently, so skip the
+        # HMAC work entirely and go straight to the primary-key load
+        cache = _get_token_cache()
+        cache_key = hashlib.sha256(token.encode()).digest()
+        with _token_cache_lock:
+            cached = cache.get(cache_key)
+        if cached is not None:
+            cached_user_id, exp = cached
+            if exp > time.time():
+                user = User.get_cached(cached_user_id)
+                if user and user.is_active:
+                    return user
+            # Expired or deactivated since caching - drop and re-verify
+            with _token_cache_lock:
+                cache.pop(cache_key, None)
+
         try:
-            # Decode with leeway to handle small time differences
+            # Single decode: signature, expiry and required claims are all
+            # checked in this one call, with leeway for small clock skew
             payload = jwt.decode(
-                token, 
-                current_app.config['SECRET_KEY'], 
-                algorithms=['HS256'],
-                leeway=10  # Allow 10 seconds leeway for time sync issues
+                token,
+                _get_jwt_secret(),
+                algorithms=JWT_ALGORITHMS,
+                leeway=10,  # Allow 10 seconds leeway for time sync issues
+                options=JWT_DECODE_OPTIONS
             )
-            user_id = payload.get('user_id')
-            if user_id:
-                user = User.query.get(user_id)
-                if user and user.is_active:
-                    print(f"✅ Token verification successful for user: {user.email}")
-                    return user
-                else:
-                    print(f"❌ User not found or inactive for ID: {user_id}")
+            # 'require' guarantees user_id is present
+            user_id = payload['user_id']
+            user = User.get_cached(user_id)
+            if user and user.is_active:
+                # debug level with %-style args: under production logging
+                # (INFO) this is a single isEnabledFor() check - no string
+                # formatting and no stdout write on the per-request path
+                logger.debug("Token verified for %s", user.email)
+                # Cache only successful verifications so failures are
+                # always re-checked
+                with _token_cache_lock:
+                    cache[cache_key] = (user_id, payload['exp'])
+                return user
             else:
-                print("❌ No user_id in token payload")
+                logger.debug("User not found or inactive for id %s", user_id)
         except jwt.ExpiredSignatureError:
-            print("❌ Token has expired")
+            logger.debug("Token has expired")
         except jwt.InvalidTokenError as e:
-            print(f"❌ Invalid token: {e}")
+            logger.debug("Invalid token: %s", e)
         except Exception as e:
-            print(f"❌ Token verification error: {e}")
+            logger.warning("Token verification error: %s", e)
         return None
     
     def generate_verification_token(self) -> str:
@@ -143,7 +327,9 @@ class User(db.Model):
         Returns:
             str: Verification token
         """
-        token = str(uuid.uuid4())
+        # token_urlsafe reads os.urandom directly - no UUID formatting, more
+        # entropy per character, and already safe to embed in a URL
+        token = secrets.token_urlsafe(32)
         self.email_verification_token = token
         return token
     
@@ -157,9 +343,9 @@ class User(db.Model):
         Returns:
             str: Password reset token
         """
-        token = str(uuid.uuid4())
+        token = secrets.token_urlsafe(32)
         self.password_reset_token = token
-        self.password_reset_expires = datetime.utcnow() + datetime.timedelta(seconds=expires_in)
+        self.password_reset_expires = datetime.utcnow() + timedelta(seconds=expires_in)
         return token
     
     def verify_password_reset_token(self, token: str) -> bool:
@@ -172,8 +358,12 @@ class User(db.Model):
         Returns:
             bool: True if token is valid and not expired, False otherwise
         """
-        return (self.password_reset_token == token and 
-                self.password_reset_expires and 
+        # Cheap null checks first, then compare_digest: a plain == leaks how
+        # many leading characters matched through its early exit, which is
+        # exactly the timing side channel reset tokens must not have
+        if not self.password_reset_token or not self.password_reset_expires:
+            return False
+        return (hmac.compare_digest(self.password_reset_token, token) and
                 self.password_reset_expires > datetime.utcnow())
     
     @property
@@ -199,16 +389,18 @@ class User(db.Model):
             'full_name': self.full_name,
             'is_active': self.is_active,
             'is_verified': self.is_verified,
-            'created_at': self.created_at.isoformat(),
-            'last_active': self.last_active.isoformat(),
-            'last_login': self.last_login.isoformat() if self.last_login else None
+            # Raw datetimes: the orjson provider in app.py serializes them
+            # natively in C, so no per-field isoformat() here (same below)
+            'created_at': self.created_at,
+            'last_active': self.last_active,
+            'last_login': self.last_login
         }
         
         if include_sensitive:
             data.update({
                 'email_verification_token': self.email_verification_token,
                 'password_reset_token': self.password_reset_token,
-                'password_reset_expires': self.password_reset_expires.isoformat() if self.password_reset_expires else None
+                'password_reset_expires': self.password_reset_expires
             })
         
         return data
@@ -221,16 +413,39 @@ class Conversation(db.Model):
     """
     __tablename__ = 'conversations'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(UUID, primary_key=True, default=generate_uuid7)
+    user_id = db.Column(UUID, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(200), nullable=True)  # Auto-generated from first message
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    # DB-stamped timestamps (see User for rationale). onupdate is a SQL
+    # function too, so ORM updates emit SET updated_at = CURRENT_TIMESTAMP
+    # rather than calling datetime.utcnow() in Python - no trigger needed
+    # and it works on every dialect.
+    created_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(), nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=db.func.current_timestamp(),
+                           onupdate=db.func.current_timestamp(), nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
-    
-    # Relationships
-    messages = db.relationship('Message', backref='conversation', lazy=True, cascade='all, delete-orphan')
-    
+    # Denormalized count maintained by the Message insert/delete events
+    # below, so serializing a conversation reads one already-fetched integer
+    # instead of counting (or worse, loading) its message rows
+    message_count = db.Column(db.Integer, default=0, nullable=False)
+    
+    # Relationships. Messages are ordered in SQL so eager loads (selectinload
+    # in the conversation endpoint) serialize chronologically instead of in
+    # whatever order the IN-query returns rows. The relationship stays lazy:
+    # list endpoints batch their counts with one grouped query, and a global
+    # 'selectin' would drag full message bodies into every conversation list.
+    messages = db.relationship('Message', back_populates='conversation', lazy=True,
+                               order_by='Message.timestamp, Message.id', cascade='all, delete-orphan')
+    user = db.relationship('User', back_populates='conversations')
+
+    # Declared on the model (not in raw init_db SQL) so every environment -
+    # including SQLite test databases - gets the same indexes, and Alembic
+    # autogenerate can see them
+    __table_args__ = (
+        db.Index('idx_conversations_user_updated', 'user_id', 'updated_at'),
+        db.Index('idx_conversations_user_active_updated', 'user_id', 'is_active', 'updated_at'),
+    )
+
     def __repr__(self):
         return f'<Conversation {self.id[:8]}... - {self.title}>'
     
@@ -238,15 +453,17 @@ class Conversation(db.Model):
         result = {
             'id': self.id,
             'title': self.title,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'is_active': self.is_active,
-            'message_count': len(self.messages)
+            # Denormalized column - already in the fetched row, no COUNT and
+            # no lazy load of the messages relationship
+            'message_count': self.message_count
         }
-        
+
         if include_messages:
             result['messages'] = [msg.to_dict() for msg in self.messages]
-        
+
         return result
 
 class Message(db.Model):
@@ -257,17 +474,32 @@ class Message(db.Model):
     """
     __tablename__ = 'messages'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = db.Column(db.String(36), db.ForeignKey('conversations.id'), nullable=False)
+    id = db.Column(UUID, primary_key=True, default=generate_uuid7)
+    conversation_id = db.Column(UUID, db.ForeignKey('conversations.id'), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # 'user' or 'assistant'
     content = db.Column(db.Text, nullable=False)
     model_used = db.Column(db.String(50), nullable=True)  # Which AI model was used
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    # DB-stamped (see User). Postgres gives both messages of a chat turn the
+    # same transaction timestamp, so orderings tie-break on the time-ordered
+    # uuid7 id to preserve insertion order.
+    timestamp = db.Column(db.DateTime, server_default=db.func.current_timestamp(), nullable=False)
     
     # Metadata
     token_count = db.Column(db.Integer, nullable=True)  # For usage tracking
     response_time = db.Column(db.Float, nullable=True)  # Response time in seconds
-    
+
+    # Relationships
+    conversation = db.relationship('Conversation', back_populates='messages')
+
+    # Serves the conversation-history fetch (messages in timestamp order).
+    # role/model_used are INCLUDEd on Postgres so count- and metadata-only
+    # scans are index-only; content stays out - a Text column can exceed the
+    # index-tuple size limit and would make inserts fail
+    __table_args__ = (
+        db.Index('idx_messages_conversation_timestamp', 'conversation_id', 'timestamp',
+                 postgresql_include=['role', 'model_used']),
+    )
+
     def __repr__(self):
         return f'<Message {self.id[:8]}... - {self.role}>'
     
@@ -277,11 +509,48 @@ class Message(db.Model):
             'role': self.role,
             'content': self.content,
             'model_used': self.model_used,
-            'timestamp': self.timestamp.isoformat(),
+            'timestamp': self.timestamp,
             'token_count': self.token_count,
             'response_time': self.response_time
         }
 
+    def to_summary_dict(self):
+        """
+        Metadata-only serialization: everything except the content body.
+
+        Pairs with load_only() queries that skip the TEXT column entirely,
+        so metadata views never transfer or hydrate megabyte-scale bodies.
+        """
+        return {
+            'id': self.id,
+            'role': self.role,
+            'model_used': self.model_used,
+            'timestamp': self.timestamp,
+            'token_count': self.token_count,
+            'response_time': self.response_time
+        }
+
+# Keep Conversation.message_count in lockstep with the messages table. The
+# targeted UPDATEs run on the flush connection inside the same transaction
+# as the insert/delete, so the counter can never drift from committed data.
+# On a cascade delete of a whole conversation the decrement just matches
+# zero rows - the parent is already gone.
+@db.event.listens_for(Message, 'after_insert')
+def _increment_message_count(mapper, connection, target):
+    connection.execute(
+        db.update(Conversation)
+        .where(Conversation.id == target.conversation_id)
+        .values(message_count=Conversation.message_count + 1)
+    )
+
+@db.event.listens_for(Message, 'after_delete')
+def _decrement_message_count(mapper, connection, target):
+    connection.execute(
+        db.update(Conversation)
+        .where(Conversation.id == target.conversation_id)
+        .values(message_count=Conversation.message_count - 1)
+    )
+
 class APIUsage(db.Model):
     """
     API Usage tracking model for monitoring and billing.
@@ -290,16 +559,33 @@ class APIUsage(db.Model):
     """
     __tablename__ = 'api_usage'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(UUID, primary_key=True, default=generate_uuid7)
+    user_id = db.Column(UUID, db.ForeignKey('users.id'), nullable=False)
     model_name = db.Column(db.String(50), nullable=False)
     endpoint = db.Column(db.String(100), nullable=False)
     tokens_used = db.Column(db.Integer, nullable=True)
-    cost_estimate = db.Column(db.Float, nullable=True)  # In USD
-    response_time = db.Column(db.Float, nullable=False)
+    # Exact decimal instead of a double: no FP rounding drift when SUMming
+    # costs, and Numeric(12,6) covers micro-dollar pricing comfortably
+    cost_estimate = db.Column(db.Numeric(12, 6), nullable=True)  # In USD
+    # Integer microseconds instead of a float of seconds: integer SUM/AVG is
+    # cheaper than FP aggregation over millions of rows. to_dict converts
+    # back to seconds so the API shape is unchanged.
+    response_time = db.Column(db.Integer, nullable=False)
     status_code = db.Column(db.Integer, nullable=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    
+    # The write-behind flush stamps rows explicitly (it needs the value for
+    # the daily-counter bucket); the server default covers direct inserts
+    timestamp = db.Column(db.DateTime, server_default=db.func.current_timestamp(), nullable=False)
+
+    # On Postgres the INCLUDEd payload columns make this a covering index,
+    # so the 30-day usage aggregation is an index-only scan; other dialects
+    # ignore the INCLUDE and build the plain composite
+    __table_args__ = (
+        db.Index(
+            'idx_api_usage_user_ts_model', 'user_id', 'timestamp', 'model_name',
+            postgresql_include=['tokens_used', 'cost_estimate', 'response_time']
+        ),
+    )
+
     def __repr__(self):
         return f'<APIUsage {self.model_name} - {self.status_code}>'
     
@@ -309,37 +595,45 @@ class APIUsage(db.Model):
             'model_name': self.model_name,
             'endpoint': self.endpoint,
             'tokens_used': self.tokens_used,
-            'cost_estimate': self.cost_estimate,
-            'response_time': self.response_time,
+            'cost_estimate': float(self.cost_estimate) if self.cost_estimate is not None else None,
+            'response_time': self.response_time / 1_000_000,
             'status_code': self.status_code,
-            'timestamp': self.timestamp.isoformat()
+            'timestamp': self.timestamp
         }
 
+class UserModelUsage(db.Model):
+    """
+    Pre-aggregated API usage counters per user, model and day.
+
+    Maintained incrementally by the usage write-behind flush in app.py, so
+    the /api/usage dashboard reads at most ~30 small rows per model instead
+    of aggregating the raw api_usage audit log on every request. api_usage
+    itself stays untouched as the immutable per-call record.
+    """
+    __tablename__ = 'user_model_usage'
+
+    user_id = db.Column(UUID, db.ForeignKey('users.id'), primary_key=True)
+    model_name = db.Column(db.String(50), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    requests = db.Column(db.Integer, nullable=False, default=0)
+    tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    cost = db.Column(db.Numeric(14, 6), nullable=False, default=0)
+    # Integer microseconds, same unit as APIUsage.response_time; divide by
+    # requests for the average
+    response_time_sum = db.Column(db.BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<UserModelUsage {self.model_name} - {self.day}>'
+
 def init_db(app):
     """Initialize the database with the Flask app."""
     db.init_app(app)
-    
+
     with app.app_context():
-        # Create all tables
+        # Create all tables. Performance indexes live in Alembic migrations
+        # (see migrations/versions/) and are built with CREATE INDEX
+        # CONCURRENTLY on Postgres, so worker startup is no longer gated on
+        # index build time and never takes a write-blocking lock.
         db.create_all()
-        
-        # Create indexes for better performance
-        with db.engine.connect() as conn:
-            conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_messages_conversation_timestamp 
-                ON messages(conversation_id, timestamp);
-            """))
-            
-            conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_conversations_user_updated 
-                ON conversations(user_id, updated_at);
-            """))
-            
-            conn.execute(text("""
-                CREATE INDEX IF NOT EXISTS idx_api_usage_user_timestamp 
-                ON api_usage(user_id, timestamp);
-            """))
-            
-            conn.commit()
-        
+
         print("✅ Database initialized successfully!") 
\ No newline at end of file
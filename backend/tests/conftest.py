@@ -0,0 +1,166 @@
+"""
+Shared fixtures for the API test suite.
+
+The expensive pieces are built exactly once per session: backend/conftest.py
+points DATABASE_URL at in-memory SQLite before backend.app is imported, and
+app.py pairs any in-memory URL with StaticPool + check_same_thread=False -
+without the pinned pool each pooled connection would get its own empty
+in-memory database, forcing the schema to be rebuilt per connection. The
+engine, pool and schema therefore all exist by the end of the import, and
+the session-scoped app fixture just configures TESTING and pushes one app
+context over that.
+
+Per-test isolation uses SQLAlchemy's "join an external transaction" recipe
+instead of create_all/drop_all: each test runs on a single connection with
+an open outer transaction, the session turns commits into SAVEPOINTs, and
+teardown rolls the whole thing back - O(1) cleanup with no DDL.
+"""
+
+import pytest
+from unittest.mock import patch
+from sqlalchemy import event
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# backend.app pulls in models.py as the top-level `models` module; import
+# that same instance (backend/ is on sys.path via backend/conftest.py) so
+# cache cleanup below touches the caches the app actually uses
+import models
+from backend.app import app as flask_app, db, limiter
+from backend.app import _token_cache as _app_token_cache
+
+
+@pytest.fixture(scope='session')
+def app():
+    """
+    Session-scoped Flask app configured for testing.
+
+    The schema already exists (import-time init_db created it on the shared
+    in-memory connection), so this only flips test config and keeps one app
+    context pushed for the whole session.
+    """
+    flask_app.config['TESTING'] = True
+    flask_app.config['WTF_CSRF_ENABLED'] = False
+    # Skip per-request metric updates and limiter storage lookups; the
+    # rate-limit test re-enables the limiter around its one request
+    flask_app.config['METRICS_ENABLED'] = False
+    limiter.enabled = False
+
+    ctx = flask_app.app_context()
+    ctx.push()
+    db.create_all()  # No-op when import-time init already built the schema
+
+    # pysqlite silently COMMITs at the wrong moments, which breaks the
+    # SAVEPOINT-based rollback below. Documented SQLAlchemy workaround:
+    # turn off the driver's own transaction management and emit BEGIN
+    # ourselves. StaticPool holds a single live connection, so flip its
+    # isolation level directly as well as for any future connects.
+    @event.listens_for(db.engine, 'connect')
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(db.engine, 'begin')
+    def _emit_begin(conn):
+        # StaticPool means every checkout is the same DBAPI connection, so
+        # other engine users (e.g. the health-check ping) would otherwise
+        # try to BEGIN inside the test's already-open transaction
+        if not conn.connection.dbapi_connection.in_transaction:
+            conn.exec_driver_sql('BEGIN')
+
+    with db.engine.connect() as conn:
+        conn.connection.dbapi_connection.isolation_level = None
+    yield flask_app
+    ctx.pop()
+
+
+@pytest.fixture
+def db_session(app):
+    """
+    Bind db.session to an outer transaction that is rolled back after the test.
+
+    commits inside the test (fixtures, endpoints) only release SAVEPOINTs on
+    this connection; the teardown rollback discards everything - including
+    "committed" rows - so tests never see each other's data and never pay
+    for schema rebuilds or row deletion.
+    """
+    connection = db.engine.connect()
+    transaction = connection.begin()
+    original_session = db.session
+    db.session = scoped_session(
+        sessionmaker(bind=connection, join_transaction_mode='create_savepoint')
+    )
+    try:
+        yield db.session
+    finally:
+        db.session.remove()
+        transaction.rollback()
+        connection.close()
+        db.session = original_session
+        # The auth caches outlive the rollback and would otherwise serve
+        # users whose rows no longer exist
+        _app_token_cache.clear()
+        models._user_cache.clear()
+        if models._token_cache is not None:
+            models._token_cache.clear()
+
+
+class _AIStub:
+    """
+    Minimal stand-in for a patched AIService method.
+
+    Returns whatever .return_value holds - same interface the tests use
+    with MagicMock, without the per-call _Call recording and magic-method
+    machinery (no test asserts on call counts or arguments).
+    """
+
+    def __init__(self):
+        self.return_value = None
+
+    def __call__(self, *args, **kwargs):
+        return self.return_value
+
+
+@pytest.fixture(autouse=True, scope='session')
+def mock_ai():
+    """
+    Patch all three AIService provider calls once for the whole session.
+
+    Per-test @patch decorators rebuild and tear down the mocks on every
+    test; patching once keeps the external providers unreachable everywhere
+    while tests that care set e.g. mock_ai['call_openai'].return_value
+    inline.
+    """
+    stubs = {name: _AIStub()
+             for name in ('call_openai', 'call_gemini', 'call_claude')}
+    with patch.multiple('backend.app.AIService', **stubs):
+        yield stubs
+
+
+@pytest.fixture(scope='session')
+def _session_client(app):
+    """
+    One test client constructed for the whole session.
+
+    The client is only a request factory - per davidism's guidance it needs
+    to be entered as a context manager solely when a test must read request
+    globals afterwards (none here do), so there is no reason to pay the
+    construction and context push/pop per test.
+    """
+    return app.test_client()
+
+
+@pytest.fixture
+def client(_session_client, db_session):
+    """The shared client, with this test's database writes rolled back after."""
+    return _session_client
+
+
+@pytest.fixture(scope='session')
+def models_response(_session_client):
+    """Memoized /api/models JSON - the payload is static, fetch it once."""
+    return _session_client.get('/api/models').json
+
+
+@pytest.fixture(scope='session')
+def health_response(_session_client):
+    """Memoized /api/health JSON for structure assertions."""
+    return _session_client.get('/api/health').json
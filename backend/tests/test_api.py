@@ -10,68 +10,75 @@ This file contains a complete testing framework for all API functionality:
 - Rate limiting and security features
 - Usage statistics and monitoring
 
-The tests use pytest fixtures for consistent test environments and
-mock external AI services to ensure reliable, fast test execution.
+The app, schema and database connection are session-scoped (see conftest.py);
+each test runs inside a rolled-back transaction, and external AI services are
+mocked so the suite is fast and deterministic.
 """
 
+# Standard library
+import time
+from datetime import date, datetime
+
 # Testing framework imports
 import pytest  # Python testing framework
-import json    # JSON handling for API responses
-
-# Mocking utilities for isolating tests
-from unittest.mock import patch, MagicMock
+from limits import parse
 
-# Flask framework for web application testing
-from flask import Flask
+# Application components to test. Model classes come through backend.app
+# (which re-exports them) so there is exactly one app/models module instance
+from backend.app import app, db, generate_uuid7, limiter, User, Conversation, Message, APIUsage, UserModelUsage
+from backend.app import _token_cache
+from models import pwd_context
 
-# Application components to test
-from backend.app import app, db  # Main Flask app and database
-from backend.models import User, Conversation, Message, APIUsage  # Database models
+# Argon2id at production cost (64 MiB, 3 passes) is by far the most
+# expensive step of building sample_user; hash the shared test password
+# once at import and reuse the digest in every test
+SAMPLE_PASSWORD_HASH = pwd_context.hash('TestPassword123!')
 
-@pytest.fixture
-def client():
-    """
-    Create a test client for the Flask application.
-    
-    This fixture sets up an isolated test environment with:
-    - In-memory SQLite database for fast testing
-    - Disabled CSRF protection for easier testing
-    - Clean database state for each test
-    
-    Yields:
-        FlaskClient: Test client for making HTTP requests
-    """
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    app.config['WTF_CSRF_ENABLED'] = False
-    
-    with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-            yield client
-            db.drop_all()
+# Shared single-turn payload: the endpoint never mutates the request body,
+# so every chat test can post the same list instead of re-allocating the
+# dicts inline
+HELLO_MESSAGES = [{'role': 'user', 'content': 'Hello'}]
 
 @pytest.fixture
-def sample_user():
+def sample_user(db_session):
     """
     Create a sample user for testing user-dependent functionality.
-    
+
     Returns:
         User: A test user instance with basic configuration
     """
-    user = User(session_id='test-session-123')
+    user = User(
+        email='sample@example.com',
+        first_name='Sample',
+        last_name='User',
+        session_id='test-session-123'
+    )
+    user.password_hash = SAMPLE_PASSWORD_HASH
     db.session.add(user)
-    db.session.commit()
+    # flush() assigns the id without ending the transaction; the db_session
+    # teardown rollback then discards the row with no DELETE needed
+    db.session.flush()
     return user
 
+@pytest.fixture
+def auth_headers(sample_user):
+    """
+    Authorization headers carrying a valid JWT for the sample user.
+
+    Returns:
+        dict: Headers to pass with authenticated requests
+    """
+    token = sample_user.generate_auth_token()
+    return {'Authorization': f'Bearer {token}'}
+
 @pytest.fixture
 def sample_conversation(sample_user):
     """
     Create a sample conversation for testing conversation functionality.
-    
+
     Args:
         sample_user: User fixture that owns this conversation
-        
+
     Returns:
         Conversation: A test conversation instance
     """
@@ -80,67 +87,97 @@ def sample_conversation(sample_user):
         title='Test Conversation'
     )
     db.session.add(conversation)
-    db.session.commit()
+    db.session.flush()
     return conversation
 
+@pytest.fixture
+def make_usage(sample_user):
+    """
+    Bulk-insert usage audit rows for the sample user.
+
+    bulk_insert_mappings skips the per-object unit-of-work bookkeeping that
+    add()/commit() pays, so seeding even a large usage history is a single
+    executemany plus one flush.
+
+    Returns:
+        callable: make_usage(n, model_name=...) inserting n APIUsage rows
+    """
+    def _make(n, model_name='openai-gpt-4o'):
+        now = datetime.utcnow()
+        rows = [
+            {
+                'id': generate_uuid7(),
+                'user_id': sample_user.id,
+                'model_name': model_name,
+                'endpoint': '/chat/completions',
+                'tokens_used': 100,
+                'cost_estimate': 0.01,
+                'response_time': 1_200_000,  # 1.2s in integer microseconds
+                'status_code': 200,
+                'timestamp': now,
+            }
+            for _ in range(n)
+        ]
+        db.session.bulk_insert_mappings(APIUsage, rows)
+        db.session.flush()
+        return rows
+    return _make
+
 class TestHealthEndpoint:
     """
     Test cases for the health check endpoint.
-    
+
     These tests verify that the health monitoring system works correctly
     and provides accurate information about system status.
     """
-    
+
     def test_health_check_success(self, client):
         """Test successful health check."""
         response = client.get('/api/health')
         assert response.status_code == 200
-        
-        data = response.get_json()
+
+        data = response.json
         assert data['status'] == 'healthy'
         assert 'timestamp' in data
         assert 'version' in data
         assert 'services' in data
 
-    def test_health_check_includes_services(self, client):
+    def test_health_check_includes_services(self, health_response):
         """Test that health check includes service status."""
-        response = client.get('/api/health')
-        data = response.get_json()
-        
-        assert 'services' in data
-        services = data['services']
+        # Structure-only assertions read the session-memoized payload
+        # instead of re-invoking the endpoint
+        assert 'services' in health_response
+        services = health_response['services']
         assert 'database' in services
         assert 'cache' in services
 
 class TestModelsEndpoint:
     """
     Test cases for the AI models endpoint.
-    
+
     These tests verify that the models endpoint correctly returns
     information about available AI models and their capabilities.
     """
-    
-    def test_get_models_success(self, client):
+
+    def test_get_models_success(self, client, models_response):
         """Test successful retrieval of available models."""
+        # One live request verifies the status code; structure checks run
+        # against the session-memoized payload
         response = client.get('/api/models')
         assert response.status_code == 200
-        
-        data = response.get_json()
-        assert 'models' in data
-        assert len(data['models']) == 3
-        
+
+        assert 'models' in models_response
+        assert len(models_response['models']) == 3
+
         # Check that all expected models are present
-        model_ids = [model['id'] for model in data['models']]
+        model_ids = [model['id'] for model in models_response['models']]
         assert 'openai' in model_ids
         assert 'gemini' in model_ids
         assert 'claude' in model_ids
 
-    def test_models_have_required_fields(self, client):
+    def test_models_have_required_fields(self, models_response):
         """Test that each model has required fields."""
-        response = client.get('/api/models')
-        data = response.get_json()
-        
-        for model in data['models']:
+        for model in models_response['models']:
             assert 'id' in model
             assert 'name' in model
             assert 'description' in model
@@ -149,290 +186,269 @@ class TestModelsEndpoint:
 class TestChatEndpoint:
     """
     Test cases for the chat endpoint.
-    
+
     These tests cover the core chat functionality including:
     - Input validation and error handling
     - Integration with different AI models
     - Response format and data integrity
     - Error scenarios and edge cases
     """
-    
-    def test_chat_missing_model(self, client):
+
+    def test_chat_requires_auth(self, client):
+        """Test that the chat endpoint rejects unauthenticated requests."""
+        response = client.post('/api/chat',
+                             json={'model': 'openai',
+                                   'messages': HELLO_MESSAGES})
+        assert response.status_code == 401
+
+        data = response.json
+        assert 'error' in data
+
+    def test_expired_token_rejected_despite_cache(self, client, sample_user):
+        """The token cache must not outlive the token's own expiry."""
+        token = sample_user.generate_auth_token(expires_in=-10)
+        # Simulate the token having been verified and cached while valid
+        _token_cache[token] = (sample_user.id, time.time() - 10)
+
+        response = client.post('/api/chat',
+                             headers={'Authorization': f'Bearer {token}'},
+                             json={'model': 'openai',
+                                   'messages': HELLO_MESSAGES})
+        assert response.status_code == 401
+
+    def test_chat_missing_model(self, client, auth_headers):
         """Test chat endpoint with missing model parameter."""
-        response = client.post('/api/chat', 
-                             json={'messages': [{'role': 'user', 'content': 'Hello'}]})
+        response = client.post('/api/chat', headers=auth_headers,
+                             json={'messages': HELLO_MESSAGES})
         assert response.status_code == 400
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'error' in data
         assert 'Model and messages are required' in data['error']
 
-    def test_chat_missing_messages(self, client):
+    def test_chat_missing_messages(self, client, auth_headers):
         """Test chat endpoint with missing messages parameter."""
-        response = client.post('/api/chat', 
+        response = client.post('/api/chat', headers=auth_headers,
                              json={'model': 'openai'})
         assert response.status_code == 400
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'error' in data
         assert 'Model and messages are required' in data['error']
 
-    def test_chat_invalid_model(self, client):
+    def test_chat_invalid_model(self, client, auth_headers):
         """Test chat endpoint with invalid model."""
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'test-user-123'
-        
-        response = client.post('/api/chat', 
+        response = client.post('/api/chat', headers=auth_headers,
                              json={
                                  'model': 'invalid_model',
-                                 'messages': [{'role': 'user', 'content': 'Hello'}]
+                                 'messages': HELLO_MESSAGES
                              })
         assert response.status_code == 400
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'error' in data
         assert 'Invalid model selected' in data['error']
 
-    @patch('backend.app.AIService.call_openai')
-    def test_chat_openai_success(self, mock_openai, client):
-        """Test successful chat with OpenAI model."""
-        # Mock the AI service response
-        mock_openai.return_value = {
+    @pytest.mark.parametrize('model,attr,payload', [
+        ('openai', 'call_openai', {
             'response': 'Hello! How can I help you?',
             'model': 'openai-gpt-4o',
             'tokens_used': 15,
             'response_time': 1.2
-        }
-        
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'test-user-123'
-        
-        response = client.post('/api/chat', 
-                             json={
-                                 'model': 'openai',
-                                 'messages': [{'role': 'user', 'content': 'Hello'}]
-                             })
-        assert response.status_code == 200
-        
-        data = response.get_json()
-        assert data['response'] == 'Hello! How can I help you?'
-        assert data['model'] == 'openai-gpt-4o'
-        assert data['status'] == 'success'
-        assert 'conversation_id' in data
-        assert 'metadata' in data
-
-    @patch('backend.app.AIService.call_gemini')
-    def test_chat_gemini_success(self, mock_gemini, client):
-        """Test successful chat with Gemini model."""
-        mock_gemini.return_value = {
+        }),
+        ('gemini', 'call_gemini', {
             'response': 'Hi there! I\'m Gemini.',
             'model': 'gemini-2.5-flash',
             'response_time': 0.8
-        }
-        
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'test-user-123'
-        
-        response = client.post('/api/chat', 
-                             json={
-                                 'model': 'gemini',
-                                 'messages': [{'role': 'user', 'content': 'Hello'}]
-                             })
-        assert response.status_code == 200
-        
-        data = response.get_json()
-        assert data['response'] == 'Hi there! I\'m Gemini.'
-        assert data['model'] == 'gemini-2.5-flash'
-
-    @patch('backend.app.AIService.call_claude')
-    def test_chat_claude_success(self, mock_claude, client):
-        """Test successful chat with Claude model."""
-        mock_claude.return_value = {
+        }),
+        ('claude', 'call_claude', {
             'response': 'Hello! I\'m Claude, nice to meet you.',
             'model': 'claude-3-5-sonnet',
             'tokens_used': 20,
             'response_time': 1.5
-        }
-        
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'test-user-123'
-        
-        response = client.post('/api/chat', 
+        }),
+    ])
+    def test_chat_success(self, mock_ai, client, auth_headers, model, attr, payload):
+        """Test successful chat with each AI provider."""
+        # The three provider tests were textually identical apart from the
+        # mocked payload, so one parametrized body covers all of them
+        mock_ai[attr].return_value = payload
+
+        response = client.post('/api/chat', headers=auth_headers,
                              json={
-                                 'model': 'claude',
-                                 'messages': [{'role': 'user', 'content': 'Hello'}]
+                                 'model': model,
+                                 'messages': HELLO_MESSAGES
                              })
         assert response.status_code == 200
-        
-        data = response.get_json()
-        assert data['response'] == 'Hello! I\'m Claude, nice to meet you.'
-        assert data['model'] == 'claude-3-5-sonnet'
 
-    @patch('backend.app.AIService.call_openai')
-    def test_chat_ai_service_error(self, mock_openai, client):
+        data = response.json
+        assert data['response'] == payload['response']
+        assert data['model'] == payload['model']
+        assert data['status'] == 'success'
+        assert 'conversation_id' in data
+        assert 'metadata' in data
+
+    def test_chat_ai_service_error(self, mock_ai, client, auth_headers):
         """Test chat endpoint when AI service returns an error."""
-        mock_openai.return_value = {'error': 'API key invalid'}
-        
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'test-user-123'
-        
-        response = client.post('/api/chat', 
+        mock_ai['call_openai'].return_value = {'error': 'API key invalid'}
+
+        response = client.post('/api/chat', headers=auth_headers,
                              json={
                                  'model': 'openai',
-                                 'messages': [{'role': 'user', 'content': 'Hello'}]
+                                 'messages': HELLO_MESSAGES
                              })
         assert response.status_code == 500
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'error' in data
 
 class TestConversationEndpoints:
     """
     Test cases for conversation management endpoints.
-    
+
     These tests verify conversation persistence, retrieval,
     and user-specific access controls for chat history.
     """
-    
-    def test_get_conversations_no_user(self, client):
-        """Test getting conversations when user doesn't exist."""
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'nonexistent-user'
-        
+
+    def test_get_conversations_requires_auth(self, client):
+        """Test getting conversations without authentication."""
         response = client.get('/api/conversations')
-        assert response.status_code == 404
-        
-        data = response.get_json()
+        assert response.status_code == 401
+
+        data = response.json
         assert 'error' in data
-        assert 'User not found' in data['error']
 
-    def test_get_conversations_success(self, client, sample_user, sample_conversation):
+    def test_get_conversations_success(self, client, auth_headers, sample_conversation):
         """Test successful retrieval of user conversations."""
-        with client.session_transaction() as sess:
-            sess['user_id'] = sample_user.session_id
-        
-        response = client.get('/api/conversations')
+        response = client.get('/api/conversations', headers=auth_headers)
         assert response.status_code == 200
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'conversations' in data
         assert len(data['conversations']) == 1
         assert data['conversations'][0]['id'] == sample_conversation.id
 
-    def test_get_specific_conversation_success(self, client, sample_user, sample_conversation):
+    def test_get_specific_conversation_success(self, client, auth_headers, sample_conversation):
         """Test successful retrieval of a specific conversation."""
-        with client.session_transaction() as sess:
-            sess['user_id'] = sample_user.session_id
-        
-        response = client.get(f'/api/conversations/{sample_conversation.id}')
+        response = client.get(f'/api/conversations/{sample_conversation.id}',
+                              headers=auth_headers)
         assert response.status_code == 200
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'conversation' in data
         assert data['conversation']['id'] == sample_conversation.id
 
-    def test_get_specific_conversation_not_found(self, client, sample_user):
+    def test_get_specific_conversation_not_found(self, client, auth_headers):
         """Test retrieval of non-existent conversation."""
-        with client.session_transaction() as sess:
-            sess['user_id'] = sample_user.session_id
-        
-        response = client.get('/api/conversations/nonexistent-id')
+        response = client.get('/api/conversations/nonexistent-id', headers=auth_headers)
         assert response.status_code == 404
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'error' in data
         assert 'Conversation not found' in data['error']
 
 class TestUsageEndpoint:
     """
     Test cases for the usage statistics endpoint.
-    
+
     These tests verify that API usage tracking and reporting
     functionality works correctly for monitoring and billing.
     """
-    
-    def test_get_usage_stats_no_user(self, client):
-        """Test getting usage stats when user doesn't exist."""
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'nonexistent-user'
-        
+
+    def test_get_usage_stats_requires_auth(self, client):
+        """Test getting usage stats without authentication."""
         response = client.get('/api/usage')
-        assert response.status_code == 404
-        
-        data = response.get_json()
+        assert response.status_code == 401
+
+        data = response.json
         assert 'error' in data
-        assert 'User not found' in data['error']
 
-    def test_get_usage_stats_success(self, client, sample_user):
+    def test_get_usage_stats_success(self, client, auth_headers, sample_user):
         """Test successful retrieval of usage statistics."""
-        # Create some sample usage data
-        usage = APIUsage(
+        # Seed the pre-aggregated counter table the endpoint reads
+        usage = UserModelUsage(
             user_id=sample_user.id,
             model_name='openai-gpt-4o',
-            endpoint='/chat/completions',
-            tokens_used=100,
-            cost_estimate=0.01,
-            response_time=1.2,
-            status_code=200
+            day=date.today(),
+            requests=1,
+            tokens=100,
+            cost=0.01,
+            response_time_sum=1_200_000  # 1.2s in integer microseconds
         )
         db.session.add(usage)
-        db.session.commit()
-        
-        with client.session_transaction() as sess:
-            sess['user_id'] = sample_user.session_id
-        
-        response = client.get('/api/usage')
+        db.session.flush()
+
+        response = client.get('/api/usage', headers=auth_headers)
         assert response.status_code == 200
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'usage' in data
         assert 'period' in data
         assert data['period'] == '30_days'
+        assert data['usage'][0]['model'] == 'openai-gpt-4o'
+        assert data['usage'][0]['requests'] == 1
+
+    def test_bulk_usage_rows_recorded(self, make_usage, sample_user):
+        """Test that bulk-seeded audit rows land in the api_usage table."""
+        make_usage(50)
+
+        count = db.session.query(db.func.count(APIUsage.id)).filter(
+            APIUsage.user_id == sample_user.id
+        ).scalar()
+        assert count == 50
 
 class TestRateLimiting:
     """
     Test cases for rate limiting functionality.
-    
+
     These tests verify that the API properly enforces rate limits
     to prevent abuse and ensure fair usage.
     """
-    
-    def test_chat_rate_limit(self, client):
+
+    def test_chat_rate_limit(self, client, auth_headers):
         """Test that chat endpoint enforces rate limits."""
-        with client.session_transaction() as sess:
-            sess['user_id'] = 'test-user-123'
-        
-        # Make multiple requests quickly to trigger rate limit
-        for i in range(15):  # Assuming limit is 10 per minute
-            response = client.post('/api/chat', 
+        # Seed the limiter's backing store to the 10-per-minute threshold
+        # directly, then make one real request: same 429 assertion as the
+        # old 15-request loop at 1/15th of the cost, and no AI mock needed
+        # because the limiter rejects before the view body runs
+        item = parse('10 per minute')
+        try:
+            # The session fixture disables the limiter for everyone else;
+            # this is the one test that needs it live
+            limiter.enabled = True
+            for _ in range(10):
+                limiter.limiter.hit(item, '127.0.0.1', 'chat')
+
+            response = client.post('/api/chat', headers=auth_headers,
                                  json={
                                      'model': 'openai',
-                                     'messages': [{'role': 'user', 'content': f'Hello {i}'}]
+                                     'messages': HELLO_MESSAGES
                                  })
-            if response.status_code == 429:
-                # Rate limit triggered
-                data = response.get_json()
-                assert 'error' in data
-                assert 'Rate limit exceeded' in data['error']
-                break
-        else:
-            # If we didn't hit rate limit, that's also acceptable for this test
-            pass
+            assert response.status_code == 429
+
+            data = response.json
+            assert 'error' in data
+            assert 'Rate limit exceeded' in data['error']
+        finally:
+            # The in-memory window would otherwise throttle the next chat
+            # test to run within 60 seconds
+            limiter.enabled = False
+            limiter.limiter.storage.reset()
 
 class TestErrorHandlers:
     """
     Test cases for global error handling.
-    
+
     These tests verify that the application properly handles
     various error conditions and returns appropriate responses.
     """
-    
+
     def test_404_handler(self, client):
         """Test 404 error handler."""
         response = client.get('/api/nonexistent')
         assert response.status_code == 404
-        
-        data = response.get_json()
+
+        data = response.json
         assert 'error' in data
         assert 'Endpoint not found' in data['error']
 
@@ -445,17 +461,17 @@ class TestErrorHandlers:
 class TestMetricsEndpoint:
     """
     Test cases for the Prometheus metrics endpoint.
-    
+
     These tests verify that monitoring and observability
     features work correctly for production deployment.
     """
-    
+
     def test_metrics_endpoint(self, client):
         """Test that metrics endpoint returns Prometheus format."""
         response = client.get('/api/metrics')
         assert response.status_code == 200
         assert response.content_type.startswith('text/plain')
-        
+
         # Check for some expected Prometheus metrics
-        content = response.get_data(as_text=True)
-        assert 'http_requests_total' in content or len(content) >= 0  # Metrics might be empty initially 
\ No newline at end of file
+        # Raw bytes comparison - no UTF-8 decode of the whole exposition
+        assert b'http_requests_total' in response.data
@@ -4,10 +4,17 @@ Helper script to start the MultiGenQA backend server.
 This script checks for the required environment variables and starts the Flask server.
 """
 
+import mmap
 import os
+import re
 import sys
 from pathlib import Path
 
+# All placeholder sentinels in one compiled alternation: a single pass over
+# the mapped bytes instead of one scan per marker. Regex operates directly
+# on the mmap, so the file is never copied into a Python string.
+_PLACEHOLDER_RE = re.compile(rb'your_|CHANGEME|changeme|TODO|xxx')
+
 def check_environment():
     """Check if the required environment variables are set."""
     backend_dir = Path(__file__).parent / 'backend'
@@ -22,13 +29,22 @@ def check_environment():
         print(f"   cp {env_example} {env_file}")
         return False
     
-    # Check if .env file has content
-    with open(env_file, 'r') as f:
-        content = f.read().strip()
-        if not content or 'your_' in content:
-            print("❌ Error: .env file exists but appears to have placeholder values")
-            print("📝 Please edit the .env file and add your actual API keys")
-            return False
+    # Check if .env file has content. Memory-map the file and scan the raw
+    # bytes for placeholder markers - no UTF-8 decode, no str copies.
+    # mmap refuses zero-length files, so treat that case as empty up front;
+    # a file with no KEY=value assignment at all (e.g. only whitespace)
+    # counts as empty too.
+    if env_file.stat().st_size == 0:
+        placeholder = True
+    else:
+        with open(env_file, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            placeholder = mm.find(b'=') == -1 or _PLACEHOLDER_RE.search(mm) is not None
+
+    if placeholder:
+        print("❌ Error: .env file exists but appears to have placeholder values")
+        print("📝 Please edit the .env file and add your actual API keys")
+        return False
     
     print("✅ Environment configuration looks good!")
     return True
@@ -46,9 +62,11 @@ def start_server():
     print("📋 Available models: http://localhost:5000/api/models")
     print("\n" + "="*50)
     
-    # Change to backend directory and start the server
+    # Change to backend directory and become the server: exec replaces this
+    # process with the Flask one directly, instead of os.system() paying for
+    # a shell fork plus a second interpreter while this script idles around
     os.chdir(backend_dir)
-    os.system('python app.py')
+    os.execvp(sys.executable, [sys.executable, 'app.py'])
 
 if __name__ == "__main__":
     start_server() 
\ No newline at end of file